@@ -1,13 +1,21 @@
-from yubikit.core import TRANSPORT, YUBIKEY
+from yubikit.core import TRANSPORT, YUBIKEY, PID, ApplicationNotAvailableError
+from yubikit.core.otp import CommandRejectedError
+from yubikit.core.smartcard import AID, SW
 from yubikit.management import (
     CAPABILITY,
     FORM_FACTOR,
     DeviceInfo,
     DeviceConfig,
+    USB_INTERFACE,
     Version,
 )
-from yubikit.support import get_name
+from yubikit import support
+from yubikit.support import get_name, read_info, _is_preview
+from yubikit.yubiotp import INS_CONFIG
 from typing import cast
+import pytest
+
+from .util import MockSmartCardConnection, select_apdu
 
 
 def info(form_factor):
@@ -166,3 +174,196 @@ def test_sky_enterprise_formfactors():
         get_name(skyep(info_nfc(FORM_FACTOR.UNKNOWN)), kt)
         == "Security Key NFC - Enterprise Edition"
     )
+
+
+def test_is_preview():
+    assert not _is_preview(Version(4, 3, 7))
+    assert _is_preview(Version(5, 0, 0))
+    assert _is_preview(Version(5, 0, 9))
+    assert not _is_preview(Version(5, 1, 0))
+    assert _is_preview(Version(5, 2, 2))
+    assert not _is_preview(Version(5, 2, 3))
+    assert not _is_preview(Version(5, 4, 3))
+    assert _is_preview(Version(5, 5, 1))
+    assert not _is_preview(Version(5, 5, 2))
+    assert not _is_preview(Version(5, 7, 0))
+
+
+def test_read_info_ccid_fallback():
+    conn = MockSmartCardConnection(
+        {
+            select_apdu(AID.OTP): (bytes.fromhex("040201050000"), SW.OK),
+            bytes.fromhex("0001100000"): (bytes.fromhex("00bc614e"), SW.OK),
+            select_apdu(AID.PIV): (b"", SW.OK),
+            select_apdu(AID.OATH): (b"", SW.OK),
+        }
+    )
+    info = read_info(conn, PID.YK4_OTP_CCID)
+
+    assert info.version == Version(4, 2, 1)
+    assert info.serial == 12345678
+    assert info.supported_capabilities[TRANSPORT.USB] == (
+        CAPABILITY.OTP | CAPABILITY.PIV | CAPABILITY.OATH | CAPABILITY.U2F
+    )
+    assert conn.sent.count(select_apdu(AID.OTP)) == 1
+
+
+class FidoSelectFailingConnection(MockSmartCardConnection):
+    def send_and_receive(self, apdu):
+        if apdu == select_apdu(AID.FIDO):
+            raise OSError("Transmit failed")
+        return super().send_and_receive(apdu)
+
+
+def test_read_info_ccid_select_error():
+    conn = FidoSelectFailingConnection(
+        {
+            select_apdu(AID.PIV): (b"", SW.OK),
+            select_apdu(AID.OATH): (b"", SW.OK),
+        },
+        TRANSPORT.NFC,
+    )
+    info = read_info(conn)
+
+    # Only the application whose SELECT failed is treated as missing
+    assert info.supported_capabilities[TRANSPORT.NFC] == (
+        CAPABILITY.PIV | CAPABILITY.OATH
+    )
+
+
+def test_read_info_ccid_fallback_with_management():
+    conn = MockSmartCardConnection(
+        {
+            select_apdu(AID.MANAGEMENT): (b"4.0.5", SW.OK),
+            select_apdu(AID.OTP): (bytes.fromhex("040005050000"), SW.OK),
+            select_apdu(AID.PIV): (b"", SW.OK),
+        }
+    )
+    info = read_info(conn, PID.YK4_OTP_CCID)
+
+    assert info.version == Version(4, 0, 5)
+    assert info.serial is None
+    assert info.supported_capabilities[TRANSPORT.USB] == (
+        CAPABILITY.OTP | CAPABILITY.PIV | CAPABILITY.U2F
+    )
+    # The applet scan uses short SELECT commands
+    assert select_apdu(AID.PIV) in conn.sent
+    assert select_apdu(AID.OATH) in conn.sent
+
+
+def test_read_info_nfc_not_a_yubikey():
+    conn = MockSmartCardConnection({}, TRANSPORT.NFC)  # Every SELECT fails
+    with pytest.raises(ValueError):
+        read_info(conn)
+
+    assert conn.sent
+    # No YubiKey OTP commands (INS_CONFIG) are sent to an unknown card
+    assert all(apdu[1] != INS_CONFIG for apdu in conn.sent)
+
+
+class SerialFailingConnection(MockSmartCardConnection):
+    def send_and_receive(self, apdu):
+        if apdu[1] == INS_CONFIG:
+            raise OSError("Card removed")
+        return super().send_and_receive(apdu)
+
+
+def test_read_info_ccid_serial_error():
+    conn = SerialFailingConnection(
+        {select_apdu(AID.OTP): (bytes.fromhex("040201050000"), SW.OK)}
+    )
+    info = read_info(conn, PID.YK4_OTP_CCID)
+
+    assert info.version == Version(4, 2, 1)
+    assert info.serial is None
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, delay):
+        self.sleeps.append(delay)
+        self.now += delay
+
+
+class RejectingManagementSession:
+    def __init__(self, conn, accept_after=None):
+        self.calls = 0
+        self.accept_after = accept_after
+
+    def read_device_info(self):
+        self.calls += 1
+        if self.accept_after is None or self.calls <= self.accept_after:
+            raise CommandRejectedError("Reclaim")
+        return "info"
+
+
+class FakeOtpSession:
+    def __init__(self, conn):
+        self.version = Version(4, 3, 1)
+
+    def get_serial(self):
+        raise CommandRejectedError("Serial not visible")
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(support, "monotonic", clock.monotonic)
+    monkeypatch.setattr(support, "sleep", clock.sleep)
+    return clock
+
+
+@pytest.fixture
+def otp_sessions(monkeypatch):
+    sessions = []
+
+    def open_session(conn):
+        sessions.append(FakeOtpSession(conn))
+        return sessions[-1]
+
+    monkeypatch.setattr(support, "YubiOtpSession", open_session)
+    return sessions
+
+
+def test_read_info_otp_reclaim_backoff(clock, otp_sessions, monkeypatch):
+    monkeypatch.setattr(support, "ManagementSession", RejectingManagementSession)
+    interfaces = USB_INTERFACE.OTP | USB_INTERFACE.CCID
+    info = support._read_info_otp(None, YUBIKEY.YK4, interfaces)
+
+    assert clock.sleeps == [0.05, 0.1, 0.2, 0.4, 0.5, 0.5, 0.5, 0.5, 0.5]
+    assert clock.now <= 3.5
+    # Budget exhausted, fall back to YubiOTP
+    assert len(otp_sessions) == 1
+    assert info.version == otp_sessions[0].version
+    assert info.serial is None
+
+
+def test_read_info_otp_reclaim_done(clock, otp_sessions, monkeypatch):
+    monkeypatch.setattr(
+        support,
+        "ManagementSession",
+        lambda conn: RejectingManagementSession(conn, accept_after=2),
+    )
+    interfaces = USB_INTERFACE.OTP | USB_INTERFACE.CCID
+    assert support._read_info_otp(None, YUBIKEY.YK4, interfaces) == "info"
+    assert clock.sleeps == [0.05, 0.1]
+    assert otp_sessions == []
+
+
+def test_read_info_otp_single_interface(clock, otp_sessions, monkeypatch):
+    def no_management(conn):
+        raise ApplicationNotAvailableError()
+
+    monkeypatch.setattr(support, "ManagementSession", no_management)
+    info = support._read_info_otp(None, YUBIKEY.YK4, USB_INTERFACE.OTP)
+
+    # Can't be reclaim with only the OTP interface, so no retries
+    assert clock.sleeps == []
+    assert len(otp_sessions) == 1
+    assert info.serial is None
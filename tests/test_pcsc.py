@@ -0,0 +1,41 @@
+import io
+import os
+import signal
+import sys
+
+import pytest
+
+pcsc = pytest.importorskip("ykman.pcsc", exc_type=ImportError)
+
+
+def test_kill_processes(monkeypatch):
+    comms = {
+        "1": "systemd\n",
+        "42": "scdaemon\n",
+        "43": "scdaemon2\n",
+        "44": "scdaemon\n",
+    }
+    killed = []
+
+    def fake_open(path):
+        pid = path.split("/")[2]
+        if pid not in comms:
+            raise FileNotFoundError(path)  # Process has exited
+        return io.StringIO(comms[pid])
+
+    def fake_kill(pid, sig):
+        if pid == 44:
+            raise PermissionError()  # Not ours to signal
+        killed.append((pid, sig))
+
+    monkeypatch.setattr(sys, "platform", "linux")
+    monkeypatch.setattr(os, "listdir", lambda path: [*comms, "99", "self", "uptime"])
+    monkeypatch.setattr(pcsc, "open", fake_open, raising=False)
+    monkeypatch.setattr(os, "kill", fake_kill)
+
+    assert pcsc._kill_processes("scdaemon", signal.SIGKILL)
+    assert killed == [(42, signal.SIGKILL)]
+
+    killed.clear()
+    assert not pcsc._kill_processes("yubikey-agent", signal.SIGHUP)
+    assert killed == []
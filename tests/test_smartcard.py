@@ -0,0 +1,31 @@
+from yubikit.core.smartcard import AID, SW, SmartCardProtocol
+from .util import MockSmartCardConnection, select_apdu
+
+
+def test_select_many():
+    conn = MockSmartCardConnection(
+        {
+            select_apdu(AID.PIV): (b"", SW.OK),
+            select_apdu(AID.OPENPGP): (b"\x01\x02", 0x6110),
+        }
+    )
+    protocol = SmartCardProtocol(conn)
+    results = protocol.select_many([AID.PIV, AID.OATH, AID.OPENPGP])
+
+    assert results == [(AID.PIV, True), (AID.OATH, False), (AID.OPENPGP, True)]
+    assert conn.sent == [select_apdu(aid) for aid in (AID.PIV, AID.OATH, AID.OPENPGP)]
+
+
+def test_chained_response():
+    get_response = b"\x00\xc0\x00\x00\x00"
+    conn = MockSmartCardConnection(
+        {
+            b"\x00\xca\x00\x00\x00": (b"\x01" * 0xFF, 0x6100),
+            get_response: [(b"\x02" * 0xFF, 0x6110), (b"\x03" * 0x10, SW.OK)],
+        }
+    )
+    protocol = SmartCardProtocol(conn)
+    resp = protocol.send_apdu(0, 0xCA, 0, 0)
+
+    assert resp == b"\x01" * 0xFF + b"\x02" * 0xFF + b"\x03" * 0x10
+    assert conn.sent[1:] == [get_response] * 2
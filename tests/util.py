@@ -8,6 +8,9 @@ from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.primitives.asymmetric import ec
 from cryptography.x509.oid import NameOID
 
+from yubikit.core import TRANSPORT
+from yubikit.core.smartcard import SW, SmartCardConnection
+
 
 logger = logging.getLogger(__name__)
 
@@ -40,3 +43,31 @@ def generate_self_signed_certificate(
         .not_valid_before(valid_from)
         .not_valid_after(valid_to)
     ).sign(private_key, hashes.SHA256(), default_backend())
+
+
+def select_apdu(aid):
+    return b"\x00\xa4\x04\x00" + bytes([len(aid)]) + aid
+
+
+class MockSmartCardConnection(SmartCardConnection):
+    """SmartCardConnection answering APDUs from a dict of canned responses.
+
+    A response can be a list, which is consumed in order for repeated commands.
+    Unknown commands get FILE_NOT_FOUND. All sent APDUs are recorded in sent.
+    """
+
+    def __init__(self, responses, transport=TRANSPORT.USB):
+        self.responses = responses
+        self.sent = []
+        self._transport = transport
+
+    @property
+    def transport(self):
+        return self._transport
+
+    def send_and_receive(self, apdu):
+        self.sent.append(apdu)
+        response = self.responses.get(apdu, (b"", SW.FILE_NOT_FOUND))
+        if isinstance(response, list):
+            return response.pop(0)
+        return response
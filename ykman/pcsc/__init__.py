@@ -39,7 +39,10 @@ from smartcard.pcsc.PCSCContext import PCSCContext
 from fido2.pcsc import CtapPcscDevice
 from time import sleep
 import subprocess  # nosec
+import signal
 import logging
+import sys
+import os
 
 logger = logging.getLogger(__name__)
 
@@ -120,10 +123,30 @@ class ScardSmartCardConnection(SmartCardConnection):
         """Sends a command APDU and returns the response data and sw"""
         logger.log(LOG_LEVEL.TRAFFIC, "SEND: %s", apdu.hex())
         data, sw1, sw2 = self.connection.transmit(list(apdu))
-        logger.log(
-            LOG_LEVEL.TRAFFIC, "RECV: %s SW=%02x%02x", bytes(data).hex(), sw1, sw2
-        )
-        return bytes(data), sw1 << 8 | sw2
+        resp = bytes(data)
+        logger.log(LOG_LEVEL.TRAFFIC, "RECV: %s SW=%02x%02x", resp.hex(), sw1, sw2)
+        return resp, sw1 << 8 | sw2
+
+
+def _kill_processes(name, sig):
+    """Send a signal to all processes with the given name, returns True if any."""
+    if not sys.platform.startswith("linux"):
+        # No Linux procfs (e.g. OS X), use pkill.
+        return subprocess.call(["pkill", f"-{int(sig)}", name]) == 0  # nosec
+
+    killed = False
+    for pid in os.listdir("/proc"):
+        if not pid.isdigit():
+            continue
+        try:
+            with open(f"/proc/{pid}/comm") as f:
+                if f.read().rstrip("\n") != name:
+                    continue
+            os.kill(int(pid), sig)
+            killed = True
+        except OSError:
+            pass  # Process has exited, or isn't ours to signal
+    return killed
 
 
 def kill_scdaemon():
@@ -144,19 +167,14 @@ def kill_scdaemon():
                 killed = True
     except ImportError:
         # Works for Linux and OS X.
-        return_code = subprocess.call(["pkill", "-9", "scdaemon"])  # nosec
-        if return_code == 0:
-            killed = True
+        killed = _kill_processes("scdaemon", signal.SIGKILL)
     if killed:
         sleep(0.1)
     return killed
 
 
 def kill_yubikey_agent():
-    killed = False
-    return_code = subprocess.call(["pkill", "-HUP", "yubikey-agent"])  # nosec
-    if return_code == 0:
-        killed = True
+    killed = _kill_processes("yubikey-agent", signal.SIGHUP)
     if killed:
         sleep(0.1)
 
@@ -45,7 +45,7 @@ from .scp import (
 from yubikit.logging import LOG_LEVEL
 from enum import Enum, IntEnum, unique
 from time import time
-from typing import Tuple
+from typing import Tuple, List, Sequence
 import abc
 import struct
 import logging
@@ -135,6 +135,20 @@ P2_SELECT = 0x00
 
 INS_SEND_REMAINING = 0xC0
 
+# SW codes returned by SELECT when the application is missing
+_SW_APPLICATION_NOT_AVAILABLE = (
+    SW.FILE_NOT_FOUND,
+    SW.APPLET_SELECT_FAILED,
+    SW.INVALID_INSTRUCTION,
+    SW.WRONG_PARAMETERS_P1P2,
+)
+
+# Pre-encoded short SELECT commands for the YubiKey applications
+_SHORT_SELECT_APDUS = {
+    bytes(aid): bytes((0, INS_SELECT, P1_SELECT, P2_SELECT, len(aid))) + aid
+    for aid in AID
+}
+
 
 class ApduProcessor(abc.ABC):
     @abc.abstractmethod
@@ -170,9 +184,9 @@ SHORT_APDU_MAX_CHUNK = 0xFF
 
 class ShortApduProcessor(ApduFormatProcessor):
     def format_apdu(self, cla, ins, p1, p2, data, le):
-        buf = struct.pack(">BBBBB", cla, ins, p1, p2, len(data)) + data
+        buf = bytes((cla, ins, p1, p2, len(data))) + data
         if le:
-            buf += struct.pack(">B", le)
+            buf += bytes((le,))
         return buf
 
     def send_apdu(self, cla, ins, p1, p2, data, le):
@@ -225,13 +239,12 @@ class ChainedResponseProcessor(ApduProcessor):
         response, sw = self.processor.send_apdu(cla, ins, p1, p2, data, le)
 
         # Read chained response
-        buf = b""
+        chunks = [response]
         while sw >> 8 == SW1_HAS_MORE_DATA:
-            buf += response
             response, sw = self.connection.send_and_receive(self._get_data)
+            chunks.append(response)
 
-        buf += response
-        return buf, sw
+        return b"".join(chunks), sw
 
 
 class TouchWorkaroundProcessor(ChainedResponseProcessor):
@@ -419,15 +432,45 @@ class SmartCardProtocol:
         try:
             return self.send_apdu(0, INS_SELECT, P1_SELECT, P2_SELECT, aid)
         except ApduError as e:
-            if e.sw in (
-                SW.FILE_NOT_FOUND,
-                SW.APPLET_SELECT_FAILED,
-                SW.INVALID_INSTRUCTION,
-                SW.WRONG_PARAMETERS_P1P2,
-            ):
+            if e.sw in _SW_APPLICATION_NOT_AVAILABLE:
                 raise ApplicationNotAvailableError()
             raise
 
+    def _format_select(self, aid: bytes) -> bytes:
+        if self._apdu_format == ApduFormat.SHORT:
+            apdu = _SHORT_SELECT_APDUS.get(bytes(aid))
+            if apdu:
+                return apdu
+        return self._processor.processor.format_apdu(
+            0, INS_SELECT, P1_SELECT, P2_SELECT, aid, 0
+        )
+
+    def select_many(self, aids: Sequence[bytes]) -> List[Tuple[bytes, bool]]:
+        """Perform SELECT instructions for several applications.
+
+        The SELECT commands are sent one after another, and the result indicates
+        which of the applications are available. An application whose SELECT
+        fails with an error is reported as unavailable.
+
+        :param aids: The YubiKey application AID values.
+        """
+        logger.debug(f"Selecting AIDs: {', '.join(aid.hex() for aid in aids)}")
+        self._reset_processor()
+
+        results = []
+        for aid in aids:
+            try:
+                _, sw = self.connection.send_and_receive(self._format_select(aid))
+            except Exception:
+                logger.warning(f"Error selecting AID {aid.hex()}", exc_info=True)
+                results.append((aid, False))
+                continue
+            available = sw == SW.OK or sw >> 8 == SW1_HAS_MORE_DATA
+            if not available and sw not in _SW_APPLICATION_NOT_AVAILABLE:
+                logger.warning(f"Unexpected SW selecting AID {aid.hex()}: {sw:04x}")
+            results.append((aid, available))
+        return results
+
     def init_scp(self, key_params: ScpKeyParams) -> None:
         try:
             if isinstance(key_params, Scp03KeyParams):
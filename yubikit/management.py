@@ -537,6 +537,10 @@ class _ManagementCtapBackend(_Backend):
         self.ctap.call(CTAP_WRITE_CONFIG, config)
 
 
+# Legacy SET MODE payload: mode code, challenge-response timeout, auto-eject timeout
+_MODE_STRUCT = struct.Struct("<BBH")
+
+
 class ManagementSession:
     def __init__(
         self,
@@ -681,7 +685,7 @@ class ManagementSession:
                     raise ValueError("Touch-eject only applicable for mode: CCID")
             self.backend.set_mode(
                 # N.B. This is little endian!
-                struct.pack("<BBH", code, chalresp_timeout, auto_eject_timeout or 0)
+                _MODE_STRUCT.pack(code, chalresp_timeout, auto_eject_timeout or 0)
             )
             logger.info("Mode configuration written")
 
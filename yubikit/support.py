@@ -33,6 +33,8 @@ from .core import (
     Connection,
     NotSupportedError,
     ApplicationNotAvailableError,
+    BadResponseError,
+    bytes2int,
 )
 from .core.otp import OtpConnection, CommandRejectedError
 from .core.fido import FidoConnection
@@ -51,9 +53,10 @@ from .management import (
     FORM_FACTOR,
     DEVICE_FLAG,
 )
-from .yubiotp import YubiOtpSession
+from .yubiotp import YubiOtpSession, CONFIG_SLOT, INS_CONFIG
 
-from time import sleep
+from bisect import bisect_right
+from time import sleep, monotonic
 from typing import Optional
 import logging
 
@@ -74,6 +77,30 @@ _SCAN_APPLETS = (
 
 _BASE_NEO_APPS = CAPABILITY.OTP | CAPABILITY.OATH | CAPABILITY.PIV | CAPABILITY.OPENPGP
 
+# Firmware version range of the YubiKey 4 FIPS series
+_FIPS_FIRST = Version(4, 4, 0)
+_FIPS_END = Version(4, 5, 0)
+
+# Time budget and retry delays (in seconds) when waiting out a USB reclaim
+_RECLAIM_TIMEOUT = 3.5
+_RECLAIM_MIN_DELAY = 0.05
+_RECLAIM_MAX_DELAY = 0.5
+
+
+def _read_otp_ccid(protocol):
+    # Select OTP and read version from the status, and serial if visible
+    status = protocol.select(AID.OTP)
+    version = Version.from_bytes(status[:3])
+    serial = None
+    try:
+        resp = protocol.send_apdu(0, INS_CONFIG, CONFIG_SLOT.DEVICE_SERIAL, 0)
+        if len(resp) != 4:
+            raise BadResponseError("Unexpected response length")
+        serial = bytes2int(resp)
+    except Exception:
+        logger.debug("Unable to read serial over OTP, no serial", exc_info=True)
+    return version, serial
+
 
 def _read_info_ccid(conn, key_type, interfaces):
     version: Optional[Version] = None
@@ -92,18 +119,14 @@ def _read_info_ccid(conn, key_type, interfaces):
 
     # Synthesize data
     capabilities = CAPABILITY(0)
+    protocol = SmartCardProtocol(conn)
 
     # Try to read serial (and version if needed) from OTP application
     serial = None
     try:
-        otp = YubiOtpSession(conn)
+        otp_version, serial = _read_otp_ccid(protocol)
         if version is None:
-            version = otp.version
-        try:
-            serial = otp.get_serial()
-        except Exception:
-            logger.debug("Unable to read serial over OTP, no serial", exc_info=True)
-
+            version = otp_version
         capabilities |= CAPABILITY.OTP
     except ApplicationNotAvailableError:
         logger.debug("Couldn't select OTP application, serial unknown")
@@ -114,18 +137,13 @@ def _read_info_ccid(conn, key_type, interfaces):
 
     # Scan for remaining capabilities
     logger.debug("Scan for available applications...")
-    protocol = SmartCardProtocol(conn)
-    for aid, code in _SCAN_APPLETS:
-        try:
-            protocol.select(aid)
+    results = protocol.select_many([aid for aid, _ in _SCAN_APPLETS])
+    for (aid, available), (_, code) in zip(results, _SCAN_APPLETS):
+        if available:
             capabilities |= code
             logger.debug("Found applet: aid: %s, capability: %s", aid, code)
-        except ApplicationNotAvailableError:
+        else:
             logger.debug("Missing applet: aid: %s, capability: %s", aid, code)
-        except Exception:
-            logger.warning(
-                "Error selecting aid: %s, capability: %s", aid, code, exc_info=True
-            )
 
     if not capabilities and not key_type:
         # NFC, no capabilities, probably not a YubiKey.
@@ -162,8 +180,10 @@ def _read_info_otp(conn, key_type, interfaces):
     except ApplicationNotAvailableError:
         otp = YubiOtpSession(conn)
 
-    # Retry during potential reclaim timeout period (~3s).
-    for _ in range(8):
+    # Retry during potential reclaim timeout period (~3s), backing off exponentially.
+    deadline = monotonic() + _RECLAIM_TIMEOUT
+    delay = _RECLAIM_MIN_DELAY
+    while True:
         try:
             if otp is None:
                 try:
@@ -175,10 +195,12 @@ def _read_info_otp(conn, key_type, interfaces):
         except CommandRejectedError:
             if otp and interfaces == USB_INTERFACE.OTP:
                 break  # Can't be reclaim with only one interface
+            if monotonic() + delay > deadline:
+                otp = YubiOtpSession(conn)
+                break
             logger.debug("Potential reclaim, sleep...", exc_info=True)
-            sleep(0.5)  # Potential reclaim
-    else:
-        otp = YubiOtpSession(conn)
+            sleep(delay)  # Potential reclaim
+            delay = min(delay * 2, _RECLAIM_MAX_DELAY)
 
     # Synthesize info
     logger.debug("Unable to get info via Management application, use fallback")
@@ -211,7 +233,7 @@ def _read_info_otp(conn, key_type, interfaces):
         serial=serial,
         version=version,
         form_factor=FORM_FACTOR.UNKNOWN,
-        supported_capabilities=capabilities.copy(),
+        supported_capabilities=capabilities,
         is_locked=False,
     )
 
@@ -249,6 +271,13 @@ def _read_info_ctap(conn, key_type, interfaces):
         )
 
 
+_INFO_READERS = {
+    SmartCardConnection: _read_info_ccid,
+    OtpConnection: _read_info_otp,
+    FidoConnection: _read_info_ctap,
+}
+
+
 def read_info(conn: Connection, pid: Optional[PID] = None) -> DeviceInfo:
     """Reads out DeviceInfo from a YubiKey, or attempts to synthesize the data.
 
@@ -282,27 +311,25 @@ def read_info(conn: Connection, pid: Optional[PID] = None) -> DeviceInfo:
     else:
         raise ValueError("PID must be provided for non-NFC connections")
 
-    if isinstance(conn, SmartCardConnection):
-        info = _read_info_ccid(conn, key_type, interfaces)
-    elif isinstance(conn, OtpConnection):
-        info = _read_info_otp(conn, key_type, interfaces)
-    elif isinstance(conn, FidoConnection):
-        info = _read_info_ctap(conn, key_type, interfaces)
-    else:
+    read_info_for_type = next(
+        (f for t, f in _INFO_READERS.items() if isinstance(conn, t)), None
+    )
+    if read_info_for_type is None:
         raise TypeError("Invalid connection type")
+    info = read_info_for_type(conn, key_type, interfaces)
 
     logger.debug("Read info: %s", info)
 
+    supported = info.supported_capabilities
+    enabled = info.config.enabled_capabilities
+
     # Set usb_enabled if missing (pre YubiKey 5)
-    if (
-        info.has_transport(TRANSPORT.USB)
-        and TRANSPORT.USB not in info.config.enabled_capabilities
-    ):
-        usb_enabled = info.supported_capabilities[TRANSPORT.USB]
+    usb_enabled = supported.get(TRANSPORT.USB)
+    if usb_enabled is not None and TRANSPORT.USB not in enabled:
         if usb_enabled == (CAPABILITY.OTP | CAPABILITY.U2F | USB_INTERFACE.CCID):
             # YubiKey Edge, hide unusable CCID interface from supported
             # usb_enabled = CAPABILITY.OTP | CAPABILITY.U2F
-            info.supported_capabilities = {
+            supported = info.supported_capabilities = {
                 TRANSPORT.USB: CAPABILITY.OTP | CAPABILITY.U2F
             }
 
@@ -318,24 +345,20 @@ def read_info(conn: Connection, pid: Optional[PID] = None) -> DeviceInfo:
                 | CAPABILITY.PIV
             )
 
-        info.config.enabled_capabilities[TRANSPORT.USB] = usb_enabled
+        enabled[TRANSPORT.USB] = usb_enabled
 
     # SKY identified by PID
     if key_type == YUBIKEY.SKY:
         info.is_sky = True
 
     # YK4-based FIPS version
-    if (4, 4, 0) <= info.version < (4, 5, 0):
+    if _is_fips_version(info.version):
         info.is_fips = True
 
     # Set nfc_enabled if missing (pre YubiKey 5)
-    if (
-        info.has_transport(TRANSPORT.NFC)
-        and TRANSPORT.NFC not in info.config.enabled_capabilities
-    ):
-        info.config.enabled_capabilities[TRANSPORT.NFC] = info.supported_capabilities[
-            TRANSPORT.NFC
-        ]
+    nfc_supported = supported.get(TRANSPORT.NFC)
+    if nfc_supported is not None and TRANSPORT.NFC not in enabled:
+        enabled[TRANSPORT.NFC] = nfc_supported
 
     # Workaround for invalid configurations.
     if info.version >= (4, 0, 0):
@@ -347,27 +370,42 @@ def read_info(conn: Connection, pid: Optional[PID] = None) -> DeviceInfo:
             info.form_factor is FORM_FACTOR.USB_C_KEYCHAIN and info.version < (5, 2, 4)
         ):
             # Known not to have NFC
-            info.supported_capabilities.pop(TRANSPORT.NFC, None)
-            info.config.enabled_capabilities.pop(TRANSPORT.NFC, None)
+            supported.pop(TRANSPORT.NFC, None)
+            enabled.pop(TRANSPORT.NFC, None)
 
     logger.debug("Device info, after tweaks: %s", info)
     return info
 
 
+def _is_fips_version(version):
+    return _FIPS_FIRST <= version < _FIPS_END
+
+
 def _fido_only(capabilities):
     return capabilities & ~(CAPABILITY.U2F | CAPABILITY.FIDO2) == 0
 
 
+# Sorted, non-overlapping [start, end) version ranges of preview firmware
+_PREVIEW_RANGES = (
+    ((5, 0, 0), (5, 1, 0)),
+    ((5, 2, 0), (5, 2, 3)),
+    ((5, 5, 0), (5, 5, 2)),
+)
+_PREVIEW_STARTS = tuple(start for start, _ in _PREVIEW_RANGES)
+_PREVIEW_ENDS = tuple(end for _, end in _PREVIEW_RANGES)
+
+
 def _is_preview(version):
-    _PREVIEW_RANGES = (
-        ((5, 0, 0), (5, 1, 0)),
-        ((5, 2, 0), (5, 2, 3)),
-        ((5, 5, 0), (5, 5, 2)),
-    )
-    for start, end in _PREVIEW_RANGES:
-        if start <= version < end:
-            return True
-    return False
+    i = bisect_right(_PREVIEW_STARTS, version) - 1
+    return i >= 0 and version < _PREVIEW_ENDS[i]
+
+
+def _append_form_factor(name_parts, suffix):
+    # Form factor letters are written together with the series, as in "5C"
+    if name_parts[-1] == "5":
+        name_parts[-1] += suffix
+    else:
+        name_parts.append(suffix)
 
 
 def get_name(info: DeviceInfo, key_type: Optional[YUBIKEY]) -> str:
@@ -433,15 +471,15 @@ def get_name(info: DeviceInfo, key_type: Optional[YUBIKEY]) -> str:
                 if not is_bio:
                     name_parts.append("5")
             if is_c:
-                name_parts.append("C")
+                _append_form_factor(name_parts, "C")
             elif info.form_factor == FORM_FACTOR.USB_C_LIGHTNING:
-                name_parts.append("Ci")
+                _append_form_factor(name_parts, "Ci")
             if is_nano:
                 name_parts.append("Nano")
             if info.has_transport(TRANSPORT.NFC):
                 name_parts.append("NFC")
             elif info.form_factor == FORM_FACTOR.USB_A_KEYCHAIN:
-                name_parts.append("A")  # Only for non-NFC A Keychain.
+                _append_form_factor(name_parts, "A")  # Only for non-NFC A Keychain.
             if is_bio:
                 name_parts.append("Bio")
                 if _fido_only(usb_supported):
@@ -452,6 +490,6 @@ def get_name(info: DeviceInfo, key_type: Optional[YUBIKEY]) -> str:
                 name_parts.append("FIPS")
             if info.is_sky and info.serial:
                 name_parts.append("- Enterprise Edition")
-            device_name = " ".join(name_parts).replace("5 C", "5C").replace("5 A", "5A")
+            device_name = " ".join(name_parts)
 
     return device_name